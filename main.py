@@ -4,10 +4,22 @@ MCP Service Manager GUI
 A simple cross-platform GUI for managing background services.
 """
 
+import asyncio
+import collections
+import concurrent.futures
+import dataclasses
+import errno
+import functools
+import hashlib
 import json
 import os
+import queue
 import re
+import select
+import shlex
+import shutil
 import signal
+import socket
 import subprocess
 import sys
 import threading
@@ -17,15 +29,106 @@ from pathlib import Path
 # Redirect stdout/stderr removed for cleanup
 # Ensure environment is set up correctly
 
+# The login shell PATH is cached between launches, keyed by $SHELL and the
+# zsh startup files' mtimes, so startup doesn't wait on a login shell.
+_PATH_CACHE = Path.home() / ".cache" / "mcp_srv_manager" / "path"
+_ZSH_RC_FILES = ("~/.zshenv", "~/.zprofile", "~/.zshrc", "~/.zlogin")
+
+
+def _path_cache_key() -> str:
+    parts = [os.environ.get("SHELL", "").encode()]
+    for rc in _ZSH_RC_FILES:
+        try:
+            mtime = os.stat(os.path.expanduser(rc)).st_mtime_ns
+        except OSError:
+            continue
+        parts.append(f"{rc}={mtime}".encode())
+    return hashlib.sha1(b"|".join(parts)).hexdigest()
+
+
+def _read_path_cache(key: str) -> tuple[str | None, bool]:
+    """Return (cached PATH, whether it was cached under key).
+
+    A PATH cached under another key is still returned: it is the last
+    login PATH seen and much closer to the user's than _system_path().
+    """
+    try:
+        cached_key, path = _PATH_CACHE.read_text().split("\n", 1)
+    except (OSError, ValueError):
+        return None, False
+    return path.strip() or None, cached_key == key
+
+
+def _write_path_cache(key: str, path: str):
+    _PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    _PATH_CACHE.write_text(f"{key}\n{path}\n")
+
+
+def _probe_login_path() -> str:
+    return subprocess.run(
+        ["/bin/zsh", "-l", "-c", "echo $PATH"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, timeout=5, check=True
+    ).stdout.strip()
+
+
+def _system_path() -> str:
+    """Build PATH the way macOS path_helper does, without a login shell.
+
+    Entries from /etc/paths and /etc/paths.d/* come first, followed by
+    the rest of the inherited PATH. Anything the user's zsh rc files add
+    (conda, nvm, ...) is missing; the login shell probe fills that in.
+    """
+    parts = []
+    for f in [Path("/etc/paths"), *sorted(Path("/etc/paths.d").glob("*"))]:
+        try:
+            parts += [line.strip() for line in f.read_text().splitlines() if line.strip()]
+        except OSError:
+            pass
+    parts += os.environ.get("PATH", "").split(os.pathsep)
+    return os.pathsep.join(p for p in dict.fromkeys(parts) if p)
+
+
+def _reprobe_login_path(key: str, cached: str | None):
+    """Background refresh of the cached PATH; takes effect next launch."""
+    try:
+        path = _probe_login_path()
+        if path and path != cached:
+            _write_path_cache(key, path)
+    except Exception:
+        pass
+
+
 try:
     # Always load user's login shell PATH — not just when frozen.
     # When launched from an IDE, os.environ["PATH"] may point to a
     # different node/yarn than the user's terminal.
     try:
-        _user_path = subprocess.check_output(
-            ["/bin/zsh", "-l", "-c", "echo $PATH"],
-            text=True, timeout=5
-        ).strip()
+        _path_key = _path_cache_key()
+        _user_path, _path_current = _read_path_cache(_path_key)
+        if _user_path:
+            # A stale entry (rc files edited since) is used as is and
+            # rewritten under the new key by the refresh
+            threading.Thread(
+                target=_reprobe_login_path,
+                args=(_path_key, _user_path if _path_current else None),
+                daemon=True
+            ).start()
+        elif os.environ.get("SVCMGR_SLOW_PATH_INIT"):
+            # Opt-in: wait for the login shell so even the first launch
+            # gets the full PATH
+            _user_path = _probe_login_path()
+            if _user_path:
+                _write_path_cache(_path_key, _user_path)
+        else:
+            # No cache at all (first launch): start with the system PATH
+            # and let the login shell probe populate the cache for the
+            # next launch
+            _user_path = _system_path()
+            threading.Thread(
+                target=_reprobe_login_path, args=(_path_key, None),
+                daemon=True
+            ).start()
         if _user_path:
             os.environ["PATH"] = _user_path
     except Exception:
@@ -41,17 +144,23 @@ try:
             os.path.expanduser("~/bin")
         ]
         
-        current_path = os.environ.get("PATH", "")
+        # Compare whole entries; a substring test would treat
+        # /usr/local/bin as present in /usr/local/binutils/bin
+        parts = os.environ.get("PATH", "").split(os.pathsep)
+        seen = set(parts)
         for p in common_paths:
-            if p not in current_path and os.path.exists(p):
-                current_path = f"{p}:{current_path}"
-        os.environ["PATH"] = current_path
+            if p not in seen and os.path.exists(p):
+                parts.insert(0, p)
+                seen.add(p)
+        os.environ["PATH"] = os.pathsep.join(parts)
 
 except Exception:
     pass
 
 
 
+import tkinter as tk
+
 import customtkinter as ctk
 
 # --- Configuration ---
@@ -85,6 +194,7 @@ if "/opt/homebrew/bin" not in _path.split(":")[0:3]:
     _path = f"/opt/homebrew/bin:{_path}"
 SHELL_ENV["PATH"] = _path
 
+@functools.lru_cache(maxsize=32)
 def _get_resource_path(relative_path: str) -> Path:
     """Get absolute path to resource, works for dev and for PyInstaller/py2app."""
     try:
@@ -108,6 +218,348 @@ def _get_resource_path(relative_path: str) -> Path:
 # --- Configuration ---
 CONFIG_FILE = _get_resource_path("services.json")
 
+# orjson is optional; it is faster but the stdlib json gives the same file
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+    _loads = json.loads
+
+# psutil is optional as well; without it non-Linux process listings fall
+# back to running ps
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# How long detected listening ports are trusted before re-querying
+_PORTS_TTL = 10.0  # seconds
+_PORTS_RETRY = 1.0  # seconds, while a service has not bound a port yet
+_PORTS_MAX_EMPTY = 4  # empty results per PID before falling back to _PORTS_TTL
+
+# Matches --port=XXXX, --port XXXX or -p XXXX
+_PORT_RE = re.compile(r'(?:--port[=\s]|-p\s)(\d+)')
+
+# Finds the PID to offer a "Kill" button for in a service error message
+_ERR_PID_RE = re.compile(r'(?:PID|running:?|by)\s*(\d+)')
+
+
+# --- Linux /proc helpers ---
+# Listening sockets are read straight from procfs on Linux, which avoids
+# forking lsof/ps on every start.
+_TCP_LISTEN = "0A"
+_PROC_NET_TTL = 0.5  # seconds
+_proc_net_cache: tuple[float, dict[int, set[str]]] | None = None
+
+
+def _proc_net_listeners() -> dict[int, set[str]]:
+    """Map listening TCP port -> socket inodes from /proc/net/tcp and tcp6.
+
+    The parse is cached for _PROC_NET_TTL so back-to-back checks reuse it.
+    """
+    global _proc_net_cache
+    now = time.monotonic()
+    if _proc_net_cache and now - _proc_net_cache[0] < _PROC_NET_TTL:
+        return _proc_net_cache[1]
+
+    listeners: dict[int, set[str]] = {}
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, "r") as f:
+                lines = f.readlines()[1:]  # Skip header
+        except OSError:
+            continue
+        for line in lines:
+            cols = line.split()
+            if len(cols) < 10 or cols[3] != _TCP_LISTEN:
+                continue
+            port = int(cols[1].rsplit(":", 1)[1], 16)
+            listeners.setdefault(port, set()).add(cols[9])
+
+    _proc_net_cache = (now, listeners)
+    return listeners
+
+
+def _proc_sweep(inodes: set[str], needles: tuple[bytes, ...] = ()):
+    """Single pass over /proc collecting socket owners and command lines.
+
+    Returns (pids holding any of the given socket inodes, [(pid, cmdline)]).
+    Command lines are only decoded for processes whose raw cmdline
+    contains one of the needles; with no needles none are read.
+    Our own process is skipped.
+    """
+    targets = {f"socket:[{inode}]" for inode in inodes}
+    owners: list[int] = []
+    cmdlines: list[tuple[int, str]] = []
+    my_pid = str(os.getpid())
+    with os.scandir("/proc") as it:
+        for entry in it:
+            if not entry.name.isdigit() or entry.name == my_pid:
+                continue
+            if needles:
+                try:
+                    with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                        raw = f.read()
+                except (FileNotFoundError, PermissionError, ProcessLookupError):
+                    continue
+                # Kernel threads have an empty cmdline. Needles never contain
+                # spaces, so testing the NUL-separated bytes is equivalent to
+                # testing the joined command line, without decoding it.
+                if raw and any(n in raw for n in needles):
+                    cmdlines.append((
+                        int(entry.name),
+                        raw.replace(b"\x00", b" ").decode("utf-8", "replace").strip(),
+                    ))
+            if targets:
+                try:
+                    with os.scandir(f"/proc/{entry.name}/fd") as fds:
+                        for fd in fds:
+                            try:
+                                if os.readlink(fd.path) in targets:
+                                    owners.append(int(entry.name))
+                                    break
+                            except OSError:
+                                continue
+                except OSError:
+                    # Process exited or belongs to another user
+                    continue
+    return sorted(owners), cmdlines
+
+
+# Blocker reported when a port has a listening socket but none of its
+# owners' fds can be read (e.g. a root-owned docker-proxy)
+_UNREADABLE_OWNER = "another user's process"
+
+
+def _describe_pids(pids: list[int]) -> str | None:
+    """Format up to 3 PIDs as 'PID(name), ...' using /proc/PID/comm."""
+    infos = []
+    for pid in pids[:3]:
+        try:
+            with open(f"/proc/{pid}/comm", "r") as f:
+                pname = f.read().strip() or "?"
+            infos.append(f"{pid}({pname})")
+        except OSError:
+            infos.append(str(pid))
+    return ", ".join(infos) if infos else None
+
+
+# --- Short-lived lookup cache ---
+# lsof/ps results are reused for _LOOKUP_TTL so several starts in quick
+# succession (e.g. toggling a few services) share one process scan.
+_LOOKUP_TTL = 0.5  # seconds
+_lookup_cache: dict = {}
+
+
+def _cached(fn, key, ttl: float = _LOOKUP_TTL):
+    """Return fn() memoized under key for ttl seconds."""
+    now = time.monotonic()
+    hit = _lookup_cache.get(key)
+    if hit and now - hit[0] < ttl:
+        return hit[1]
+    value = fn()
+    _lookup_cache[key] = (now, value)
+    return value
+
+
+def _ps_table() -> list[tuple[int, str]]:
+    """List (pid, command) for every process.
+
+    Reads the process table through psutil when it is installed, so no
+    ps has to be forked; otherwise parses ps output.
+    """
+    if psutil is not None:
+        return [
+            (p.info["pid"], " ".join(p.info["cmdline"]))
+            for p in psutil.process_iter(["pid", "cmdline"])
+            if p.info["cmdline"]
+        ]
+    result = subprocess.run(
+        ["ps", "-eo", "pid,command"],
+        capture_output=True, text=True, timeout=2
+    )
+    procs = []
+    for line in result.stdout.strip().splitlines()[1:]: # Skip header
+        p = line.strip().split(None, 1)
+        if len(p) == 2 and p[0].isdigit():
+            procs.append((int(p[0]), p[1]))
+    return procs
+
+
+def _lsof_port_owners(port: int) -> str | None:
+    """Describe the processes listening on port as 'PID(name), ...' via lsof."""
+    try:
+        result = subprocess.run(
+            ["lsof", "-i", f":{port}", "-t", "-sTCP:LISTEN"],
+            capture_output=True, text=True, timeout=3
+        )
+        pids = result.stdout.strip().splitlines()
+        if not pids:
+            return None
+        pids = pids[:3]  # show up to 3
+        # Get all process names with a single ps call
+        names = {}
+        try:
+            ps = subprocess.run(
+                ["ps", "-p", ",".join(pids), "-o", "pid=,comm="],
+                capture_output=True, text=True, timeout=2
+            )
+            for line in ps.stdout.splitlines():
+                p = line.strip().split(None, 1)
+                if len(p) == 2:
+                    names[p[0]] = p[1].split('/')[-1]
+        except Exception:
+            pass
+        return ", ".join(f"{pid}({names[pid]})" if pid in names else pid for pid in pids)
+    except Exception:
+        return None
+
+
+# ss reports the owning process of each listening socket in one call,
+# unlike lsof which needs a separate ps lookup for process names.
+_HAS_SS = sys.platform.startswith("linux") and shutil.which("ss") is not None
+_SS_USER_RE = re.compile(r'\("([^"]*)",pid=(\d+),fd=\d+\)')
+
+
+def _ss_listeners() -> dict[int, list[tuple[int, str]]]:
+    """Map listening TCP port -> [(pid, process_name), ...] using ss."""
+    out = subprocess.run(
+        ["ss", "-Hltnp"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, timeout=2
+    ).stdout
+    listeners: dict[int, list[tuple[int, str]]] = {}
+    for line in out.splitlines():
+        cols = line.split()
+        if len(cols) < 4:
+            continue
+        port_str = cols[3].rsplit(":", 1)[-1]
+        if not port_str.isdigit():
+            continue
+        owners = listeners.setdefault(int(port_str), [])
+        for pname, pid in _SS_USER_RE.findall(line):
+            if (int(pid), pname) not in owners:
+                owners.append((int(pid), pname))
+    return listeners
+
+
+# --- Command parsing ---
+_SHELL_CHARS = set('|&;<>()$`\\"*?[]{}~!#\n')
+
+
+def _split_plain_command(command: str) -> tuple[list[str], str] | None:
+    """Split a command that can be exec'd without /bin/sh.
+
+    Returns (argv, executable) with the executable resolved against
+    SHELL_ENV's PATH, or None when the command uses shell syntax, starts
+    with a VAR=value assignment, or names something not on PATH (e.g. a
+    shell builtin), in which case it has to run with shell=True.
+    """
+    if any(c in _SHELL_CHARS for c in command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or "=" in argv[0]:
+        return None
+    # Resolved on every start, not cached: a recreated venv or reinstalled
+    # tool would otherwise leave a stale path behind
+    executable = shutil.which(argv[0], path=SHELL_ENV["PATH"])
+    if executable is None:
+        return None
+    return argv, executable
+
+
+# --- Async helpers ---
+# How long a fresh service is watched for an immediate crash. Crashes in
+# this window are reported with the tail of the service's output.
+_STARTUP_GRACE = 1.5  # seconds
+
+async def _wait_until(cond, timeout: float) -> bool:
+    """Poll cond() with backoff (1ms doubling up to 50ms) for up to timeout.
+
+    Returns True as soon as cond() holds, False on timeout. Yields to the
+    event loop between polls instead of blocking it.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while not cond():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+    return True
+
+
+def _group_alive(pgid: int) -> bool:
+    try:
+        os.killpg(pgid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def _open_exit_watch(pid: int):
+    """Return (fd, close) where fd turns readable once pid exits.
+
+    Uses a pidfd on Linux 5.3+ and a one-shot kqueue on macOS; returns
+    None where neither is available.
+    """
+    if hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(pid)
+        except OSError:
+            return None
+        return fd, functools.partial(os.close, fd)
+    if hasattr(select, "kqueue"):
+        kq = select.kqueue()
+        try:
+            kq.control([select.kevent(
+                pid, select.KQ_FILTER_PROC,
+                select.KQ_EV_ADD | select.KQ_EV_ONESHOT, select.KQ_NOTE_EXIT,
+            )], 0)
+        except OSError:
+            kq.close()
+            return None
+        return kq.fileno(), kq.close
+    return None
+
+
+def _exit_watch_supported() -> bool:
+    watch = _open_exit_watch(os.getpid())
+    if watch is None:
+        return False
+    watch[1]()
+    return True
+
+
+# --- Output capture ---
+_TAIL_CHUNKS = 8  # keep the last few reads of each stream
+
+
+def _drain(stream, buf: collections.deque):
+    """Read a child's pipe until EOF, keeping only the newest chunks."""
+    try:
+        for chunk in iter(lambda: stream.read1(4096), b""):
+            buf.append(chunk)
+    except (OSError, ValueError):
+        pass
+    finally:
+        stream.close()
+
+
+def _tail_text(buf: collections.deque) -> str:
+    return b"".join(buf).decode("utf-8", "replace").strip()[-300:]
+
 
 class ServiceManager:
     """Backend: manages service processes."""
@@ -116,68 +568,151 @@ class ServiceManager:
         self.services: list[dict] = []
         self.processes: dict[str, subprocess.Popen] = {}
         self.errors: dict[str, str] = {}
+        # name -> stderr tail of the running process, kept up by its drain
+        self._stderr_tails: dict[str, collections.deque] = {}
+        # name -> (pid, queried_at, ports, empty results in a row for pid),
+        # see snapshot() and ports_due_in()
+        self._ports_cache: dict[str, tuple[int, float, tuple[int, ...], int]] = {}
+        # Called with the service name (from the loop thread) when a
+        # watched process exits; only set when exit_events is True.
+        self.on_exit = None
+        self.exit_events = _exit_watch_supported()
+        # pids with a pending exit watch, i.e. known to be alive
+        self._watched_pids: set[int] = set()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
         self.load_config()
 
     def load_config(self):
         if CONFIG_FILE.exists():
-            with open(CONFIG_FILE, "r") as f:
-                data = json.load(f)
-                self.services = data.get("services", [])
+            data = _loads(CONFIG_FILE.read_bytes())
+            self.services = data.get("services", [])
         else:
             self.services = []
+        self._dirty = self._rename_duplicates()
+        self._reindex()
+
+    def _rename_duplicates(self) -> bool:
+        """Give hand-edited duplicate names a ' (2)', ' (3)', ... suffix.
+
+        Services are addressed by name (see add_service), so each one
+        needs its own. Returns True if anything was renamed.
+        """
+        taken = {svc["name"] for svc in self.services}
+        seen = set()
+        renamed = False
+        for svc in self.services:
+            name = svc["name"]
+            if name in seen:
+                n = 2
+                while f"{name} ({n})" in taken:
+                    n += 1
+                svc["name"] = f"{name} ({n})"
+                taken.add(svc["name"])
+                renamed = True
+            seen.add(svc["name"])
+        return renamed
+
+    def _reindex(self):
+        """Rebuild the name -> service lookup used by _find."""
+        self._by_name: dict[str, dict] = {svc["name"]: svc for svc in self.services}
 
     def save_config(self):
-        with open(CONFIG_FILE, "w") as f:
-            json.dump({"services": self.services}, f, indent=2, ensure_ascii=False)
+        new = _dumps({"services": self.services})
+        # Write a sibling file and rename it over the config, so a crash
+        # mid-write never leaves a truncated services.json behind. Go
+        # through any symlink and keep the file's mode, as writing in
+        # place would.
+        target = CONFIG_FILE.resolve()
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(new)
+        try:
+            shutil.copymode(target, tmp)
+        except OSError:
+            pass  # no config yet
+        os.replace(tmp, target)
+        self._dirty = False
 
     def add_service(self, name: str, command: str) -> dict:
+        # Services are addressed by name, so names must be unique
+        if name in self._by_name:
+            raise ValueError(f"Service '{name}' already exists")
         svc = {"name": name, "command": command}
         self.services.append(svc)
+        self._reindex()
         self.save_config()
         return svc
 
-    def update_command(self, index: int, new_command: str):
-        if 0 <= index < len(self.services):
-            self.services[index]["command"] = new_command
+    def update_command(self, index: int, new_command: str, save: bool = True) -> bool:
+        """Set a service's command; returns False if nothing changed."""
+        if not 0 <= index < len(self.services):
+            return False
+        if self.services[index]["command"] == new_command:
+            return False
+        self.services[index]["command"] = new_command
+        self._dirty = True
+        if save:
             self.save_config()
+        return True
 
-    def remove_service(self, index: int):
-        if 0 <= index < len(self.services):
-            svc = self.services[index]
-            self.stop(svc["name"])
-            self.services.pop(index)
+    def flush(self):
+        """Write any in-memory changes made with save=False."""
+        if self._dirty:
             self.save_config()
 
+    def remove_service(self, name: str):
+        """Drop a service from the config; stop it first with stop_nowait()."""
+        svc = self._by_name.get(name)
+        if svc is None:
+            return
+        self.services = [s for s in self.services if s is not svc]
+        self._reindex()
+        self.save_config()
+
     @staticmethod
     def _extract_port(command: str) -> int | None:
         """Parse --port=XXXX or --port XXXX or -p XXXX from a command."""
-        m = re.search(r'(?:--port[=\s]|-p\s)(\d+)', command)
+        m = _PORT_RE.search(command)
         return int(m.group(1)) if m else None
 
+    @staticmethod
+    def _port_is_free(port: int) -> bool:
+        """Cheap check: can we bind the port on all IPv4/IPv6 addresses?
+
+        A successful bind proves nothing is listening, so the costlier owner
+        lookup can be skipped. Any failure (in use, privileged port, ...)
+        returns False and leaves the decision to the full check.
+        """
+        families = [(socket.AF_INET, "0.0.0.0")]
+        if socket.has_ipv6:
+            families.append((socket.AF_INET6, "::"))
+        for family, host in families:
+            try:
+                with socket.socket(family, socket.SOCK_STREAM) as s:
+                    s.bind((host, port))
+            except OSError as e:
+                if family == socket.AF_INET6 and e.errno == errno.EADDRNOTAVAIL:
+                    continue  # IPv6 disabled on this host
+                return False
+        return True
+
     @staticmethod
     def _check_port_conflict(port: int) -> str | None:
         """Check if port is in use. Returns 'PID/process_name' or None."""
+        if ServiceManager._port_is_free(port):
+            return None
+        if sys.platform.startswith("linux"):
+            return ServiceManager._check_port_conflict_linux(port)
+        return _cached(functools.partial(_lsof_port_owners, port), ("lsof", port))
+
+    @staticmethod
+    def _check_port_conflict_linux(port: int) -> str | None:
+        """Linux variant of _check_port_conflict that reads /proc instead of forking lsof."""
         try:
-            result = subprocess.run(
-                ["lsof", "-i", f":{port}", "-t", "-sTCP:LISTEN"],
-                capture_output=True, text=True, timeout=3
-            )
-            pids = result.stdout.strip().splitlines()
-            if not pids:
+            inodes = _proc_net_listeners().get(port)
+            if not inodes:
                 return None
-            # Get process name for the first PID
-            infos = []
-            for pid in pids[:3]:  # show up to 3
-                try:
-                    ps = subprocess.run(
-                        ["ps", "-p", pid, "-o", "comm="],
-                        capture_output=True, text=True, timeout=2
-                    )
-                    pname = ps.stdout.strip().split('/')[-1] or "?"
-                    infos.append(f"{pid}({pname})")
-                except Exception:
-                    infos.append(pid)
-            return ", ".join(infos)
+            return _describe_pids(_proc_sweep(inodes)[0]) or _UNREADABLE_OWNER
         except Exception:
             return None
 
@@ -185,46 +720,117 @@ class ServiceManager:
     def _find_same_cmd_processes(command: str) -> str | None:
         """Find existing processes running this exact command."""
         try:
-            # Safe search: look for unique part of command (the script/exe name)
-            parts = command.strip().split()
-            if not parts: return None
-            
-            # Find the most distinctive part (usually the script path or executable)
-            target = parts[0]
-            if target.endswith("python") or target.endswith("python3"):
-                if len(parts) > 1:
-                    target = parts[1] # Use the script name instead
-            
-            target_name = target.split('/')[-1]
-
-            result = subprocess.run(
-                ["ps", "-eo", "pid,command"],
-                capture_output=True, text=True, timeout=2
-            )
-            lines = result.stdout.strip().splitlines()
-            infos = []
-            my_pid = os.getpid()
-            
-            for line in lines[1:]: # Skip header
-                p = line.strip().split(None, 1)
-                if len(p) < 2: continue
-                pid_str, cmd_line = p[0], p[1]
-                
-                if pid_str == str(my_pid): continue
-                if "grep" in cmd_line or " pgrep " in cmd_line: continue
-                if "main.py" in cmd_line and "mcp_srv_manager" in cmd_line: continue
+            if sys.platform.startswith("linux"):
+                needles = ServiceManager._same_cmd_needles(command)
+                if not needles: return None
+                procs = _proc_sweep(set(), needles)[1]
+            else:
+                procs = _cached(_ps_table, "ps")
+            return ServiceManager._match_same_cmd(command, procs)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _same_cmd_targets(command: str) -> tuple[str, str] | None:
+        """Return (target, target_name) identifying a command's processes."""
+        # Safe search: look for unique part of command (the script/exe name)
+        parts = command.strip().split()
+        if not parts: return None
+        
+        # Find the most distinctive part (usually the script path or executable)
+        target = parts[0]
+        if target.endswith("python") or target.endswith("python3"):
+            if len(parts) > 1:
+                target = parts[1] # Use the script name instead
+        
+        return target, target.split('/')[-1]
+
+    @staticmethod
+    def _same_cmd_needles(command: str) -> tuple[bytes, ...]:
+        """Byte strings for pre-filtering raw /proc cmdlines."""
+        targets = ServiceManager._same_cmd_targets(command)
+        if not targets: return ()
+        return tuple({t.encode() for t in targets if t})
+
+    @staticmethod
+    def _match_same_cmd(command: str, procs) -> str | None:
+        """Pick the PIDs from (pid, cmdline) pairs that run this command."""
+        targets = ServiceManager._same_cmd_targets(command)
+        if not targets: return None
+        target, target_name = targets
+
+        infos = []
+        my_pid = os.getpid()
+        
+        for pid, cmd_line in procs:
+            if pid == my_pid: continue
+            if "grep" in cmd_line or " pgrep " in cmd_line: continue
+            if "main.py" in cmd_line and "mcp_srv_manager" in cmd_line: continue
+
+            # Check if it looks like the target
+            if target in cmd_line or (target_name and target_name in cmd_line):
+                 # Double check it's not just a substring match of something else
+                 infos.append(f"{pid}")
+
+        return ", ".join(infos[:3]) if infos else None
+
+    @staticmethod
+    def _preflight(command: str, port: int | None) -> tuple[str | None, str | None]:
+        """Return (port blocker, existing same-command PIDs) for a start.
+
+        On Linux both come from one sweep over /proc; elsewhere this falls
+        back to the separate lsof and ps lookups.
+        """
+        if sys.platform.startswith("linux"):
+            try:
+                inodes = set()
+                if port and not ServiceManager._port_is_free(port):
+                    inodes = _proc_net_listeners().get(port, set())
+                needles = ServiceManager._same_cmd_needles(command)
+                owners, cmdlines = _proc_sweep(inodes, needles)
+                blocker = _describe_pids(owners)
+                if inodes and not blocker:
+                    blocker = _UNREADABLE_OWNER
+                return (blocker,
+                        ServiceManager._match_same_cmd(command, cmdlines))
+            except Exception:
+                pass
+        blocker = ServiceManager._check_port_conflict(port) if port else None
+        return blocker, ServiceManager._find_same_cmd_processes(command)
+
+    # ---- Actions ----
+    # start/stop/restart run as coroutines on one background event loop:
+    # waiting for a service to come up or shut down doesn't hold a thread,
+    # and the blocking lsof/ps lookups run in worker threads, so any number
+    # of actions can be in flight at once.
+
+    def _submit(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
 
-                # Check if it looks like the target
-                if target in cmd_line or (target_name and target_name in cmd_line):
-                     # Double check it's not just a substring match of something else
-                     infos.append(f"{pid_str}")
+    def start_nowait(self, name: str) -> concurrent.futures.Future:
+        return self._submit(self._start(name))
 
-            return ", ".join(infos[:3]) if infos else None
+    def stop_nowait(self, name: str) -> concurrent.futures.Future:
+        return self._submit(self._stop(name))
 
+    def restart_nowait(self, name: str) -> concurrent.futures.Future:
+        return self._submit(self._restart(name))
+
+    def close(self):
+        """Cancel in-flight actions and stop the event loop thread."""
+        async def cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            self._submit(cancel_all()).result(timeout=2)
         except Exception:
-            return None
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
 
-    def start(self, name: str) -> bool:
+    async def _start(self, name: str) -> bool:
         if name in self.processes and self.processes[name].poll() is None:
             return True
 
@@ -235,88 +841,114 @@ class ServiceManager:
 
         self.errors.pop(name, None)
 
-        # 1. Check port
+        # 1. Check port, 2. check existing process with same command
         port = self._extract_port(svc["command"])
-        if port:
-            blocker = self._check_port_conflict(port)
-            if blocker:
-                self.errors[name] = f"Port {port} used by {blocker}"
-                return False
+        # The lookups may fork lsof/ps; keep them off the event loop
+        blocker, existing = await asyncio.to_thread(self._preflight, svc["command"], port)
+        if blocker:
+            self.errors[name] = f"Port {port} used by {blocker}"
+            return False
 
-        # 2. Check existing process with same command
-        existing = self._find_same_cmd_processes(svc["command"])
         if existing:
              self.errors[name] = f"Process running: PID {existing}"
              return False
 
         try:
-            import tempfile
-
-            # Capture stderr to a temp file for error diagnostics
-            stderr_file = tempfile.NamedTemporaryFile(
-                mode='w+', suffix='.err', delete=False, prefix='svcmgr_'
-            )
-            stdout_file = tempfile.NamedTemporaryFile(
-                mode='w+', suffix='.out', delete=False, prefix='svcmgr_'
-            )
-            # Run command directly with shell=True. SHELL_ENV already has
-            # the correct PATH from login shell probe at startup.
+            # Capture output through pipes; drain threads keep only a short
+            # tail in memory for error diagnostics.
+            # Run command directly (shell=True only if it needs shell
+            # syntax). SHELL_ENV already has the correct PATH from login
+            # shell probe at startup.
             # Do NOT wrap in "zsh -l -c" — login shell runs path_helper
             # which reorders PATH and puts /usr/local/bin before /opt/homebrew/bin.
-            proc = subprocess.Popen(
-                svc["command"],
-                shell=True,
+            popen = functools.partial(
+                subprocess.Popen,
                 stdin=subprocess.DEVNULL,
-                stdout=stdout_file,
-                stderr=stderr_file,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 env=SHELL_ENV,
-                preexec_fn=os.setsid if sys.platform != "win32" else None,
+                # Same effect as preexec_fn=os.setsid, but doesn't force
+                # subprocess off its vfork/posix_spawn fast path.
+                start_new_session=(sys.platform != "win32"),
             )
-            time.sleep(0.8)
-            if proc.poll() is not None:
-                # Read captured stderr and stdout
-                stderr_file.seek(0)
-                stderr_out = stderr_file.read().strip()[-300:]
-                stderr_file.close()
-                stdout_file.seek(0)
-                stdout_out = stdout_file.read().strip()[-300:]
-                stdout_file.close()
+            plain = _split_plain_command(svc["command"])
+            if plain is None:
+                proc = popen(svc["command"], shell=True)
+            else:
                 try:
-                    os.unlink(stderr_file.name)
-                    os.unlink(stdout_file.name)
-                except Exception:
-                    pass
+                    proc = popen(plain[0], executable=plain[1])
+                except OSError as e:
+                    # A script without a shebang: /bin/sh runs those as
+                    # shell scripts, a direct exec refuses them
+                    if e.errno != errno.ENOEXEC:
+                        raise
+                    proc = popen(svc["command"], shell=True)
+            stdout_buf = collections.deque(maxlen=_TAIL_CHUNKS)
+            stderr_buf = collections.deque(maxlen=_TAIL_CHUNKS)
+            drains = [
+                threading.Thread(target=_drain, args=(proc.stdout, stdout_buf), daemon=True),
+                threading.Thread(target=_drain, args=(proc.stderr, stderr_buf), daemon=True),
+            ]
+            for t in drains:
+                t.start()
+            # Give the service a moment to crash on startup; returns as
+            # soon as the child exits instead of always waiting.
+            try:
+                crashed = await _wait_until(lambda: proc.poll() is not None, _STARTUP_GRACE)
+            except asyncio.CancelledError:
+                # App is closing mid-start; don't leave an untracked child
+                self._signal_group(proc, kill=True)
+                raise
+            if crashed:
+                # Let the drains pick up whatever is left in the pipes
+                await _wait_until(lambda: not any(t.is_alive() for t in drains), 0.2)
+                stderr_out = _tail_text(stderr_buf)
+                stdout_out = _tail_text(stdout_buf)
 
                 err_msg = f"Exit code {proc.returncode}"
                 combined = (stderr_out + " " + stdout_out).strip()
                 if combined:
                     err_msg += f" — {combined[:300]}"
-                if port:
-                    blocker = self._check_port_conflict(port)
-                    if blocker:
-                        err_msg += f" | port {port} held by PID {blocker}"
-                # Check for existing same-command processes
-                existing = self._find_same_cmd_processes(svc["command"])
+                # Check for port holders and existing same-command processes.
+                # Drop cached lookups: they predate the crash.
+                _lookup_cache.clear()
+                blocker, existing = await asyncio.to_thread(self._preflight, svc["command"], port)
+                if blocker:
+                    holder = blocker if blocker == _UNREADABLE_OWNER else f"PID {blocker}"
+                    err_msg += f" | port {port} held by {holder}"
                 if existing:
                     err_msg += f" | running: {existing}"
                 self.errors[name] = err_msg
                 return False
-            stderr_file.close()
-            stdout_file.close()
-            try:
-                os.unlink(stderr_file.name)
-                os.unlink(stdout_file.name)
-            except Exception:
-                pass
 
             self.processes[name] = proc
+            self._stderr_tails[name] = stderr_buf
+            self._watch_exit(name, proc)
             return True
         except Exception as e:
             self.errors[name] = str(e)
             return False
 
-    def stop(self, name: str) -> bool:
+    def _watch_exit(self, name: str, proc: subprocess.Popen):
+        """Report proc's exit through on_exit without polling for it."""
+        watch = _open_exit_watch(proc.pid)
+        if watch is None:
+            return
+        fd, close = watch
+        self._watched_pids.add(proc.pid)
+
+        def exited():
+            self._watched_pids.discard(proc.pid)
+            self._loop.remove_reader(fd)
+            close()
+            if self.on_exit is not None:
+                self.on_exit(name)
+
+        self._loop.add_reader(fd, exited)
+
+    async def _stop(self, name: str) -> bool:
         self.errors.pop(name, None)
+        self._stderr_tails.pop(name, None)
         proc = self.processes.get(name)
         if proc is None:
             return True
@@ -324,101 +956,234 @@ class ServiceManager:
             self.processes.pop(name, None)
             return True
 
+        exited = lambda: proc.poll() is not None
         try:
             if sys.platform == "win32":
                 proc.terminate()
             else:
                 os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
-            proc.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            try:
-                if sys.platform == "win32":
-                    proc.kill()
-                else:
-                    os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
-                proc.wait(timeout=3)
-            except Exception:
-                pass
+            if not await _wait_until(exited, 5):
+                try:
+                    if sys.platform == "win32":
+                        proc.kill()
+                    else:
+                        os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+                    await _wait_until(exited, 3)
+                except OSError:
+                    pass
         except ProcessLookupError:
             pass
         except Exception as e:
+            self.processes.pop(name, None)
             self.errors[name] = str(e)
             return False
-        finally:
-            self.processes.pop(name, None)
+        # Not in a finally: if cancelled on quit, stop_all still sees it
+        self.processes.pop(name, None)
         return True
 
-    def restart(self, name: str) -> bool:
-        self.stop(name)
-        time.sleep(0.3)
-        return self.start(name)
+    async def _restart(self, name: str) -> bool:
+        pgid = None
+        proc = self.processes.get(name)
+        if proc is not None and proc.poll() is None and sys.platform != "win32":
+            try:
+                pgid = os.getpgid(proc.pid)
+            except OSError:
+                pass
+        await self._stop(name)
+        # _stop() returns once the direct child is reaped, but descendants
+        # (e.g. the real server under "sh -c") may still be releasing their
+        # port. Poll the group instead of a blind sleep, bounded by the old
+        # 0.3s delay.
+        if pgid is not None:
+            await _wait_until(lambda: not _group_alive(pgid), 0.3)
+        return await self._start(name)
 
     def is_running(self, name: str) -> bool:
         proc = self.processes.get(name)
         if proc is None:
             return False
         if proc.poll() is not None:
+            tail = _tail_text(self._stderr_tails.pop(name, ()))
             if name not in self.errors:
-                self.errors[name] = f"Process exited with code {proc.returncode}"
+                err_msg = f"Process exited with code {proc.returncode}"
+                if tail:
+                    err_msg += f" — {tail}"
+                self.errors[name] = err_msg
             self.processes.pop(name, None)
             return False
         return True
 
-    def get_pid(self, name: str) -> int | None:
-        proc = self.processes.get(name)
-        if proc and proc.poll() is None:
-            return proc.pid
-        return None
+    def snapshot(self) -> dict[str, tuple]:
+        """Return {name: (running, pid, ports, error)} for every service.
 
-    def get_error(self, name: str) -> str | None:
-        return self.errors.get(name)
-    def get_ports(self, name: str) -> list[int]:
-        """Detect actual listening ports from the process and all descendants."""
-        pid = self.get_pid(name)
-        if not pid:
-            return []
-        ports = set()
-        try:
-            # Use process group (we start with setsid) to find ALL descendants
-            pids = {str(pid)}
+        Processes with a pending exit watch are known to be alive and are
+        not polled at all; the rest are polled once. Ports come from the
+        cache only; refresh_all_ports() fills it from a background thread
+        (see ports_due_in()), so this never spawns a subprocess.
+        """
+        out = {}
+        for svc in self.services:
+            name = svc["name"]
+            proc = self.processes.get(name)
+            running = proc is not None and (proc.pid in self._watched_pids or self.is_running(name))
+            pid = proc.pid if running else None
+            cached = self._ports_cache.get(name)
+            ports = cached[2] if pid and cached and cached[0] == pid else ()
+            out[name] = (running, pid, tuple(ports), self.errors.get(name))
+        return out
+
+    def ports_due_in(self) -> float | None:
+        """Seconds until a running service's ports are due to be re-queried.
+
+        Due means a service with a new PID, one with no port found yet after
+        _PORTS_RETRY, or any cached result older than _PORTS_TTL. A service
+        that still has no port after _PORTS_MAX_EMPTY queries (e.g. a stdio
+        server) is only re-queried every _PORTS_TTL as well. Returns 0
+        if a query is due now and None if no service is running.
+        """
+        now = time.monotonic()
+        due = None
+        for name, proc in list(self.processes.items()):
+            if proc.poll() is not None:
+                continue
+            cached = self._ports_cache.get(name)
+            if cached is None or cached[0] != proc.pid:
+                return 0.0
+            retrying = not cached[2] and cached[3] < _PORTS_MAX_EMPTY
+            ttl = _PORTS_RETRY if retrying else _PORTS_TTL
+            left = max(0.0, cached[1] + ttl - now)
+            due = left if due is None else min(due, left)
+        return due
+
+    def refresh_all_ports(self) -> bool:
+        """Detect listening ports of every running service in one ss/lsof sweep.
+
+        Services are started in their own process group, so selecting by
+        PGID covers the process and all its descendants. Returns True if
+        any service's ports changed.
+        """
+        groups: dict[str, tuple[int, int]] = {}  # name -> (pid, pgid)
+        for name, proc in list(self.processes.items()):
+            if proc.poll() is None:
+                try:
+                    groups[name] = (proc.pid, os.getpgid(proc.pid))
+                except OSError:
+                    pass
+
+        ports_by_group: dict[int, set[int]] = {}
+        if groups and _HAS_SS:
+            wanted = {g for _, g in groups.values()}
             try:
-                pgid = os.getpgid(pid)
-                out = subprocess.check_output(
-                    ["pgrep", "-g", str(pgid)],
-                    stderr=subprocess.DEVNULL, timeout=2
-                ).decode()
-                for line in out.strip().splitlines():
-                    if line.strip().isdigit():
-                        pids.add(line.strip())
+                for port, owners in _ss_listeners().items():
+                    for pid, _ in owners:
+                        try:
+                            pgid = os.getpgid(pid)
+                        except OSError:
+                            continue
+                        if pgid in wanted:
+                            ports_by_group.setdefault(pgid, set()).add(port)
             except Exception:
                 pass
-            # Query lsof for all PIDs at once
-            pid_list = ",".join(pids)
+        elif groups:
+            pgid_list = ",".join(str(g) for _, g in groups.values())
             try:
-                out = subprocess.check_output(
-                    ["lsof", "-aPi", "-sTCP:LISTEN", "-p", pid_list, "-Fn"],
-                    stderr=subprocess.DEVNULL, timeout=2
-                ).decode()
+                # lsof exits 1 when some group has no listening socket, so
+                # don't treat the return code as an error.
+                out = subprocess.run(
+                    ["lsof", "-aPi", "-sTCP:LISTEN", "-g", pgid_list, "-Fgn"],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True, timeout=2
+                ).stdout
+                pgid = None
                 for line in out.splitlines():
-                    if line.startswith("n") and ":" in line:
+                    if line.startswith("g") and line[1:].isdigit():
+                        pgid = int(line[1:])
+                    elif line.startswith("n") and ":" in line and pgid is not None:
                         port_str = line.rsplit(":", 1)[-1]
                         if port_str.isdigit():
-                            ports.add(int(port_str))
+                            ports_by_group.setdefault(pgid, set()).add(int(port_str))
             except Exception:
                 pass
-        except Exception:
-            pass
-        return sorted(ports)
+
+        now = time.monotonic()
+        old = self._ports_cache
+        cache = {}
+        for name, (pid, pgid) in groups.items():
+            ports = tuple(sorted(ports_by_group.get(pgid, ())))
+            prev = old.get(name)
+            empty = 0
+            if not ports:
+                empty = prev[3] + 1 if prev and prev[0] == pid else 1
+            cache[name] = (pid, now, ports, empty)
+        self._ports_cache = cache
+        return {n: (c[0], c[2]) for n, c in old.items()} != {
+            n: (c[0], c[2]) for n, c in self._ports_cache.items()
+        }
 
     def _find(self, name: str) -> dict | None:
-        for svc in self.services:
-            if svc["name"] == name:
-                return svc
-        return None
+        return self._by_name.get(name)
+
+    @staticmethod
+    def _signal_group(proc: subprocess.Popen, kill: bool = False):
+        """Terminate (or kill) the service's process group, ignoring errors."""
+        try:
+            if sys.platform == "win32":
+                if kill:
+                    proc.kill()
+                else:
+                    proc.terminate()
+            else:
+                os.killpg(os.getpgid(proc.pid), signal.SIGKILL if kill else signal.SIGTERM)
+        except Exception:
+            pass
 
     def stop_all(self):
-        for name in list(self.processes.keys()):
-            self.stop(name)
+        """Stop every service, signalling all of them before waiting on any.
+
+        All services share one grace period, so shutdown takes as long as
+        the slowest service instead of the sum of all of them.
+        """
+        procs = list(self.processes.items())
+        for name, proc in procs:
+            self.errors.pop(name, None)
+            if proc.poll() is None:
+                self._signal_group(proc)
+
+        stragglers = []
+        deadline = time.monotonic() + 5
+        for name, proc in procs:
+            try:
+                proc.wait(timeout=max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                self._signal_group(proc, kill=True)
+                stragglers.append(proc)
+
+        deadline = time.monotonic() + 3
+        for proc in stragglers:
+            try:
+                proc.wait(timeout=max(0, deadline - time.monotonic()))
+            except Exception:
+                pass
+
+        for name, _ in procs:
+            self.processes.pop(name, None)
+
+
+@dataclasses.dataclass
+class RowWidgets:
+    """Widgets of one service row, kept so rows can be updated in place."""
+    item_frame: ctk.CTkFrame
+    status_dot: ctk.CTkLabel
+    pid_label: ctk.CTkLabel
+    port_label: ctk.CTkLabel
+    name_label: ctk.CTkLabel
+    cmd_entry: ctk.CTkEntry
+    switch: ctk.CTkSwitch | None
+    switch_var: ctk.BooleanVar
+    index: int
+    port_text: str = ""
+    error: str | None = None
+    err_row: ctk.CTkFrame | None = None
 
 
 class App(ctk.CTk):
@@ -431,25 +1196,83 @@ class App(ctk.CTk):
         self.geometry("820x420")
         self.minsize(700, 280)
 
-        # Set window icon
+        # Set window icon (Tk 8.6 reads PNG natively, no Pillow needed)
         try:
-            from PIL import Image, ImageTk
             icon_path = _get_resource_path("icon.png")
             if icon_path.exists():
-                img = Image.open(icon_path).resize((256, 256))
-                self._icon_img = ImageTk.PhotoImage(img)
+                img = tk.PhotoImage(file=str(icon_path))
+                # Downscale oversized icons to ~256px
+                factor = max(img.width(), img.height()) // 256
+                if factor > 1:
+                    img = img.subsample(factor)
+                self._icon_img = img
                 self.wm_iconphoto(True, self._icon_img)
         except Exception:
             pass
 
+        self._init_post()
         self.mgr = ServiceManager()
-        self._rebuilding = False
-        self._pending_rebuild = False
+        self.mgr.on_exit = lambda name: self._post(self._schedule_rebuild)
+        self._rebuild_after_id = None
+        self._last_snapshot: dict[str, tuple] = {}
+        self._row_widgets: dict[str, RowWidgets] = {}
+        self._empty_label = None
+        self._save_after_id = None
         self._build_ui()
         self._rebuild_list()
         self._auto_refresh()
+        self._ports_stop = threading.Event()
+        self._ports_wake = threading.Event()
+        threading.Thread(target=self._ports_worker, daemon=True).start()
         self.after(10, self._center_window)
 
+    # ---- Cross-thread calls ----
+    # Calling Tk from another thread blocks until the Tk thread serves the
+    # call, which deadlocks if the Tk thread is itself waiting on that
+    # thread. Background threads instead queue callables with _post(),
+    # and a byte on a pipe wakes Tk to run them.
+
+    def _init_post(self):
+        self._posted: queue.SimpleQueue = queue.SimpleQueue()
+        self._post_r = self._post_w = None
+        if hasattr(self.tk, "createfilehandler"):
+            self._post_r, self._post_w = os.pipe()
+            os.set_blocking(self._post_r, False)
+            os.set_blocking(self._post_w, False)
+            self.tk.createfilehandler(self._post_r, tk.READABLE, self._run_posted)
+        else:
+            # No file handlers (Windows): check the queue periodically
+            self._poll_posted()
+
+    def _post(self, fn):
+        """Run fn on the Tk thread soon; safe from any thread, never blocks."""
+        self._posted.put(fn)
+        if self._post_w is not None:
+            try:
+                os.write(self._post_w, b"\0")
+            except OSError:
+                pass  # pipe full: a wakeup is already pending
+
+    def _run_posted(self, fd=None, mask=None):
+        if fd is not None:
+            try:
+                os.read(fd, 4096)
+            except OSError:
+                pass
+        while True:
+            try:
+                fn = self._posted.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                fn()
+            except Exception:
+                self.report_callback_exception(*sys.exc_info())
+
+    def _poll_posted(self):
+        self._run_posted()
+        self.after(50, self._poll_posted)
+
     def _center_window(self):
         """Center window on screen."""
         self.update_idletasks()
@@ -497,6 +1320,14 @@ class App(ctk.CTk):
         self._bind_undo_redo(self.entry_name)
         self._bind_undo_redo(self.entry_cmd)
 
+        # Name entry turns red on a duplicate name until edited
+        self._name_border = self.entry_name.cget("border_color")
+        self.entry_name._entry.bind(
+            "<KeyRelease>",
+            lambda e: self.entry_name.configure(border_color=self._name_border),
+            add="+",
+        )
+
         ctk.CTkButton(
             add_frame, text="+ Add", width=64, height=30, corner_radius=8,
             fg_color="#7c3aed", hover_color="#6d28d9",
@@ -540,45 +1371,72 @@ class App(ctk.CTk):
     # ---- List management ----
 
     def _rebuild_list(self):
-        """Full rebuild of the service row list."""
-        if self._rebuilding:
-            self._pending_rebuild = True
-            return
-        self._rebuilding = True
-
-        try:
-            for widget in self.scroll_frame.winfo_children():
-                widget.destroy()
-
-            services = list(self.mgr.services)  # snapshot
-
-            if not services:
-                ctk.CTkLabel(
+        """Reconcile the service rows with the current services and status.
+
+        Rows are keyed by service name and reused; only added/removed
+        services create or destroy widgets, and only rows whose status,
+        position, command or switch state changed are touched.
+        """
+        self._rebuild_after_id = None
+        services = list(self.mgr.services)  # snapshot
+        wanted = [svc["name"] for svc in services]
+
+        # Drop rows of removed services
+        for name in list(self._row_widgets):
+            if name not in wanted:
+                self._row_widgets.pop(name).item_frame.destroy()
+
+        if not services:
+            self._last_snapshot = {}
+            if self._empty_label is None:
+                self._empty_label = ctk.CTkLabel(
                     self.scroll_frame,
                     text="No services yet.  Add one below ↓",
                     font=("Arial", 13), text_color=COLOR_TEXT_DIM,
-                ).pack(pady=40)
-                return
+                )
+                self._empty_label.pack(pady=40)
+            return
+        if self._empty_label is not None:
+            self._empty_label.destroy()
+            self._empty_label = None
 
-            for i, svc in enumerate(services):
-                name = svc["name"]
-                running = self.mgr.is_running(name)
-                pid = self.mgr.get_pid(name)
-                ports = self.mgr.get_ports(name)
-                error = self.mgr.get_error(name)
-                self._create_row(i, svc, running, pid, ports, error)
-        finally:
-            self._rebuilding = False
-            if self._pending_rebuild:
-                self._pending_rebuild = False
-                self.after(50, self._rebuild_list)
+        order_changed = [n for n in self._row_widgets] != [
+            n for n in wanted if n in self._row_widgets
+        ]
+        snapshot = self.mgr.snapshot()
+        rows = {}
+        for i, svc in enumerate(services):
+            name = svc["name"]
+            running, pid, ports, error = snapshot[name]
+            row = self._row_widgets.get(name)
+            if row is None:
+                row = self._create_row(i, svc, running, pid, list(ports), error)
+            elif (snapshot[name] != self._last_snapshot.get(name)
+                  or row.index != i or row.cmd_entry.get() != svc["command"]
+                  # The switch is flipped by the user, not the snapshot; a
+                  # start failing the same way as last time must reset it
+                  or row.switch_var.get() != running):
+                self._update_row(row, i, svc, running, pid, list(ports), error)
+            rows[name] = row
+        self._row_widgets = rows
+        self._last_snapshot = snapshot
+
+        if order_changed:
+            for row in rows.values():
+                row.item_frame.pack_forget()
+            for row in rows.values():
+                row.item_frame.pack(fill="x", pady=1)
+
+    def _schedule_rebuild(self):
+        """Queue one _rebuild_list on Tk's idle queue; bursts coalesce."""
+        if self._rebuild_after_id is None:
+            self._rebuild_after_id = self.after_idle(self._rebuild_list)
 
     def _create_row(self, index: int, svc: dict, running: bool,
-                    pid: int | None, ports: list[int], error: str | None):
+                    pid: int | None, ports: list[int], error: str | None) -> RowWidgets:
         """Create one service row frame — vertical container."""
         # Main container for the item
-        bg = COLOR_BG_ERR if error else COLOR_BG_CARD
-        item_frame = ctk.CTkFrame(self.scroll_frame, fg_color=bg, corner_radius=6)
+        item_frame = ctk.CTkFrame(self.scroll_frame, fg_color=COLOR_BG_CARD, corner_radius=6)
         item_frame.pack(fill="x", pady=1)
 
         # -- Top Row: Status, Info, Controls --
@@ -586,32 +1444,29 @@ class App(ctk.CTk):
         top_row.pack(fill="x", pady=2, padx=4)
 
         # Status dot
-        color = COLOR_RUNNING if running else COLOR_STOPPED
-        ctk.CTkLabel(
-            top_row, text="●", font=("Arial", 12), text_color=color, width=14
-        ).pack(side="left", padx=(4, 2), pady=6)
+        status_dot = ctk.CTkLabel(
+            top_row, text="●", font=("Arial", 12), width=14
+        )
+        status_dot.pack(side="left", padx=(4, 2), pady=6)
 
         # PID
-        pid_text = str(pid) if pid else "—"
-        pid_color = COLOR_TEXT_DIM if pid else COLOR_BORDER
-        ctk.CTkLabel(
-            top_row, text=pid_text, font=("Menlo", 9),
-            text_color=pid_color, width=44, anchor="e"
-        ).pack(side="left", padx=(0, 2), pady=6)
+        pid_label = ctk.CTkLabel(
+            top_row, text="—", font=("Menlo", 9), width=44, anchor="e"
+        )
+        pid_label.pack(side="left", padx=(0, 2), pady=6)
 
-        # Port(s)
-        if running and ports:
-            port_text = " ".join(f":{p}" for p in ports)
-            ctk.CTkLabel(
-                top_row, text=port_text, font=("Menlo", 9),
-                text_color=COLOR_RUNNING, anchor="w"
-            ).pack(side="left", padx=(0, 2), pady=6)
+        # Port(s) — packed by _update_row only while there is something to show
+        port_label = ctk.CTkLabel(
+            top_row, text="", font=("Menlo", 9),
+            text_color=COLOR_RUNNING, anchor="w"
+        )
 
         # Name
-        ctk.CTkLabel(
+        name_label = ctk.CTkLabel(
             top_row, text=svc["name"], font=("Arial", 12, "bold"),
             text_color=COLOR_TEXT, anchor="w", width=80
-        ).pack(side="left", padx=(4, 4), pady=6)
+        )
+        name_label.pack(side="left", padx=(4, 4), pady=6)
 
         # Command field
         cmd_entry = ctk.CTkEntry(
@@ -619,7 +1474,6 @@ class App(ctk.CTk):
             fg_color="transparent", border_width=0, height=26
         )
         cmd_entry.insert(0, svc["command"])
-        cmd_entry.bind("<FocusOut>", lambda e, i=index: self._on_cmd_change(i, cmd_entry.get()))
         cmd_entry.bind("<Return>", lambda e: self.focus())
 
         # Undo/Redo support
@@ -627,82 +1481,135 @@ class App(ctk.CTk):
 
         cmd_entry.pack(side="left", fill="x", expand=True, padx=8)
 
+        switch_var = ctk.BooleanVar(value=running)
+        row = RowWidgets(
+            item_frame=item_frame, status_dot=status_dot, pid_label=pid_label,
+            port_label=port_label, name_label=name_label, cmd_entry=cmd_entry,
+            switch=None, switch_var=switch_var, index=index,
+        )
+
+        # Handlers read row.index so they stay valid when rows above are removed
+        cmd_entry.bind("<FocusOut>", lambda e, r=row: self._on_cmd_change(r.index, r.cmd_entry.get()))
+
         # Controls
         ctk.CTkButton(
             top_row, text="✕", width=24, height=24, corner_radius=12,
             fg_color="transparent", hover_color="#dc2626",
             text_color=COLOR_TEXT_DIM, font=("Arial", 11),
-            command=lambda i=index: self._on_delete(i)
+            command=lambda r=row: self._on_delete(r.index)
         ).pack(side="right", padx=(2, 4))
 
         ctk.CTkButton(
             top_row, text="↻", width=28, height=24, corner_radius=5,
             fg_color="#2563eb", hover_color="#1d4ed8",
             font=("Arial", 13),
-            command=lambda i=index: self._on_restart(i)
+            command=lambda r=row: self._on_restart(r.index)
         ).pack(side="right", padx=2)
 
-        switch_var = ctk.BooleanVar(value=running)
-        switch = ctk.CTkSwitch(
+        row.switch = ctk.CTkSwitch(
             top_row, text="", variable=switch_var,
             width=40, height=20,
             progress_color=COLOR_RUNNING,
             button_color=COLOR_TEXT,
             fg_color=COLOR_BORDER,
-            # We bind command via configure below to capture cmd_entry
+            command=lambda r=row: self._on_toggle(r.index, r.switch_var.get(), r.cmd_entry),
         )
-        switch.pack(side="right", padx=(4, 4))
+        row.switch.pack(side="right", padx=(4, 4))
+
+        self._update_row(row, index, svc, running, pid, ports, error)
+        return row
+
+    def _update_row(self, row: RowWidgets, index: int, svc: dict, running: bool,
+                    pid: int | None, ports: list[int], error: str | None):
+        """Refresh an existing row's widgets in place."""
+        row.index = index
+        row.item_frame.configure(fg_color=COLOR_BG_ERR if error else COLOR_BG_CARD)
+
+        # Status dot
+        row.status_dot.configure(text_color=COLOR_RUNNING if running else COLOR_STOPPED)
+
+        # PID
+        row.pid_label.configure(
+            text=str(pid) if pid else "—",
+            text_color=COLOR_TEXT_DIM if pid else COLOR_BORDER,
+        )
+
+        # Port(s)
+        port_text = " ".join(f":{p}" for p in ports) if running else ""
+        if port_text != row.port_text:
+            if port_text:
+                row.port_label.configure(text=port_text)
+                if not row.port_text:
+                    row.port_label.pack(side="left", padx=(0, 2), pady=6, after=row.pid_label)
+            else:
+                row.port_label.pack_forget()
+            row.port_text = port_text
+
+        # Keep the command in sync unless the user is editing it
+        if row.cmd_entry.get() != svc["command"] and self.focus_get() is not row.cmd_entry._entry:
+            row.cmd_entry.configure(state="normal")
+            row.cmd_entry.delete(0, "end")
+            row.cmd_entry.insert(0, svc["command"])
 
         # Disable cmd if running
         if running:
-            cmd_entry.configure(state="disabled")
+            row.cmd_entry.configure(state="disabled", border_width=0)
         else:
-            cmd_entry.configure(border_width=1, border_color=COLOR_BORDER)
-
-        # Bind toggle
-        switch.configure(command=lambda i=index, v=switch_var, w=cmd_entry: self._on_toggle(i, v.get(), w))
+            row.cmd_entry.configure(state="normal", border_width=1, border_color=COLOR_BORDER)
 
+        row.switch_var.set(running)
 
         # -- Error Row: Message & Kill Button --
-        if error:
-            # Try parsing PID
-            conflicting_pid = None
-            try:
-                import re
-                m = re.search(r'(?:PID|running:?|by)\s*(\d+)', error)
-                if m: conflicting_pid = int(m.group(1))
-            except Exception: pass
-
-            err_row = ctk.CTkFrame(item_frame, fg_color="transparent")
-            err_row.pack(fill="x", padx=10, pady=(0, 6))
-
-            ctk.CTkLabel(
-                err_row, text=f"⚠️ {error}", font=("Arial", 11),
-                text_color=COLOR_STOPPED, anchor="w", wraplength=500
-            ).pack(side="left", fill="x", expand=True)
-
-            if conflicting_pid:
-                def _do_kill(_pid=conflicting_pid):
-                    try:
-                        os.kill(_pid, signal.SIGKILL)
-                    except Exception as e:
-                        print(f"Failed to kill {_pid}: {e}")
-                    self.after(200, self._auto_refresh)
-
-                ctk.CTkButton(
-                    err_row, text=f"Kill PID {conflicting_pid}", width=80, height=20,
-                    fg_color="#b91c1c", hover_color="#991b1b",
-                    text_color="#ffffff",
-                    font=("Arial", 10, "bold"), command=_do_kill
-                ).pack(side="right", padx=5)
+        if error != row.error:
+            if row.err_row is not None:
+                row.err_row.destroy()
+                row.err_row = None
+            if error:
+                row.err_row = self._create_err_row(row.item_frame, error)
+            row.error = error
+
+    def _create_err_row(self, item_frame, error: str):
+        # Try parsing PID
+        conflicting_pid = None
+        m = _ERR_PID_RE.search(error)
+        if m: conflicting_pid = int(m.group(1))
+
+        err_row = ctk.CTkFrame(item_frame, fg_color="transparent")
+        err_row.pack(fill="x", padx=10, pady=(0, 6))
+
+        ctk.CTkLabel(
+            err_row, text=f"⚠️ {error}", font=("Arial", 11),
+            text_color=COLOR_STOPPED, anchor="w", wraplength=500
+        ).pack(side="left", fill="x", expand=True)
+
+        if conflicting_pid:
+            def _do_kill(_pid=conflicting_pid):
+                try:
+                    os.kill(_pid, signal.SIGKILL)
+                except Exception as e:
+                    print(f"Failed to kill {_pid}: {e}")
+                self.after(200, self._auto_refresh)
+
+            ctk.CTkButton(
+                err_row, text=f"Kill PID {conflicting_pid}", width=80, height=20,
+                fg_color="#b91c1c", hover_color="#991b1b",
+                text_color="#ffffff",
+                font=("Arial", 10, "bold"), command=_do_kill
+            ).pack(side="right", padx=5)
+        return err_row
 
     # ---- Actions ----
 
     def _on_cmd_change(self, index: int, new_cmd: str):
-        # Helper to update command from entry
-        if 0 <= index < len(self.mgr.services):
-            if new_cmd != self.mgr.services[index]["command"]:
-                self.mgr.update_command(index, new_cmd)
+        # Helper to update command from entry. The change is applied in
+        # memory right away (_start() reads it); the disk write is debounced.
+        if self.mgr.update_command(index, new_cmd, save=False):
+            if self._save_after_id is None:
+                self._save_after_id = self.after(200, self._flush_saves)
+
+    def _flush_saves(self):
+        self._save_after_id = None
+        self.mgr.flush()
 
     def _save_cmd(self, index: int, entry_widget):
          # Legacy wrapper if needed, or just use _on_cmd_change
@@ -716,54 +1623,100 @@ class App(ctk.CTk):
              self._on_cmd_change(index, cmd_widget.get().strip())
         name = self.mgr.services[index]["name"]
         if turn_on:
-            threading.Thread(target=self._do_action,
-                             args=(self.mgr.start, name), daemon=True).start()
+            self._do_action(self.mgr.start_nowait, name)
         else:
-            threading.Thread(target=self._do_action,
-                             args=(self.mgr.stop, name), daemon=True).start()
+            self._do_action(self.mgr.stop_nowait, name)
 
     def _on_restart(self, index: int):
         if 0 <= index < len(self.mgr.services):
             name = self.mgr.services[index]["name"]
-            threading.Thread(target=self._do_action,
-                             args=(self.mgr.restart, name), daemon=True).start()
+            self._do_action(self.mgr.restart_nowait, name)
 
     def _do_action(self, fn, name: str):
-        fn(name)
-        self.after(100, self._rebuild_list)
-        # Delayed refresh to pick up port info after process binds
-        self.after(1000, self._rebuild_list)
+        # Port info shows up on its own once the process binds:
+        # _ports_worker posts a rebuild as soon as the ports change.
+        def done(f):
+            self._ports_wake.set()
+            self._post(self._schedule_rebuild)
+
+        fn(name).add_done_callback(done)
 
     def _on_delete(self, index: int):
         if 0 <= index < len(self.mgr.services):
-            self.mgr.remove_service(index)
-            self._rebuild_list()
+            name = self.mgr.services[index]["name"]
+            # Don't wait for the stop here; the row goes once it is down
+            self.mgr.stop_nowait(name).add_done_callback(
+                lambda f: self._post(lambda: self._finish_delete(name))
+            )
+
+    def _finish_delete(self, name: str):
+        self.mgr.remove_service(name)
+        self._schedule_rebuild()
 
     def _on_add(self):
         name = self.entry_name.get().strip()
         cmd = self.entry_cmd.get().strip()
         if not name or not cmd:
             return
-        self.mgr.add_service(name, cmd)
+        try:
+            self.mgr.add_service(name, cmd)
+        except ValueError:
+            self.entry_name.configure(border_color=COLOR_STOPPED)
+            return
         self.entry_name.delete(0, "end")
         self.entry_cmd.delete(0, "end")
-        self._rebuild_list()
+        self._schedule_rebuild()
+
+    def _rebuild_list_if_changed(self):
+        if self.mgr.snapshot() != self._last_snapshot:
+            self._schedule_rebuild()
 
     def _auto_refresh(self):
-        """Lightweight status check — only rebuild if a status actually changed."""
-        changed = False
-        for svc in self.mgr.services:
-            name = svc["name"]
-            was_running = name in self.mgr.processes
-            is_running = self.mgr.is_running(name)
-            if was_running and not is_running:
-                changed = True
-        if changed:
-            self._rebuild_list()
-        self.after(2000, self._auto_refresh)
+        """Lightweight status check — only rebuild if a status actually changed.
+
+        Keeps polling every 2s only where the manager can't report process
+        exits itself (see ServiceManager.on_exit).
+        """
+        self._rebuild_list_if_changed()
+        if not self.mgr.exit_events:
+            self.after(2000, self._auto_refresh)
+
+    def _ports_worker(self):
+        """Background loop that keeps the manager's port cache fresh.
+
+        lsof/ss run here rather than on the Tk thread, so a slow or hung
+        query can't freeze the window. Between queries it sleeps until the
+        next one is due, or until _do_action wakes it; with no service
+        running it sleeps until then.
+        """
+        while not self._ports_stop.is_set():
+            # Clear before checking, so a wakeup from here on is not lost
+            self._ports_wake.clear()
+            try:
+                due = self.mgr.ports_due_in()
+                if due == 0:
+                    if self.mgr.refresh_all_ports():
+                        self._post(self._rebuild_list_if_changed)
+                    continue
+            except Exception:
+                due = _PORTS_RETRY
+            self._ports_wake.wait(due)
 
     def destroy(self):
+        if self._save_after_id is not None:
+            self.after_cancel(self._save_after_id)
+            self._flush_saves()
+        if self._rebuild_after_id is not None:
+            self.after_cancel(self._rebuild_after_id)
+        self._ports_stop.set()
+        self._ports_wake.set()
+        self.mgr.close()
         self.mgr.stop_all()
+        if self._post_r is not None:
+            self.tk.deletefilehandler(self._post_r)
+            post_w, self._post_w = self._post_w, None
+            os.close(self._post_r)
+            os.close(post_w)
         super().destroy()
 
 
@@ -35,13 +35,13 @@ OPTIONS = {
 # Alias mode uses symlinks and doesn't need them.
 if not alias_mode:
     OPTIONS.update({
-        "packages": ["customtkinter", "PIL"],
-        "includes": ["customtkinter", "PIL", "packaging"],
+        "packages": ["customtkinter"],
+        "includes": ["customtkinter", "packaging"],
         "excludes": [
             "pip", "setuptools", "wheel",
             "numpy", "pandas", "scipy", "matplotlib",
             "sphinx", "ipython", "notebook",
-            "docutils", "jedi"
+            "docutils", "jedi", "PIL"
         ],
     })
 